@@ -1,31 +1,151 @@
+import io
+import mmap
 import re  # regex
+from concurrent.futures import ThreadPoolExecutor
+from functools import partialmethod
 import numpy as np
 from scipy import interpolate
 
-def extract_int_from_string(line):
-    numbers = [int(num_str) for num_str in re.findall(r'\b\d+\b', line)]
-    return numbers
+try:
+    from numba import njit
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional, the kernels then run as plain python
+    _HAVE_NUMBA = False
 
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
 
-def extract_float_from_string(line):
-    numbers = [float(num_str) for num_str in re.findall("[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?", line)]
-    return numbers
+# Regular expressions used while parsing, compiled once at module load
+_INT_RE = re.compile(r'\b\d+\b')
+_FLOAT_RE = re.compile(r"[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?")
+_EOS_RE = re.compile(r'(EOS=)([^}]*)')
 
+# Encoding of the tab files. Latin-1 maps every byte to a character, so names and units with non-ASCII characters
+# (e.g. a degree sign written by Windows tools) never fail to decode
+_ENCODING = 'latin-1'
 
-class PhysicalProperty:
-    def __init__(self):
-        self.data = []
-        self.description = 'unspecified'
-        self.unit = 'unspecified'
+# Removes apostrophes and replaces commas by spaces in one pass
+_CLEAN_TBL = str.maketrans({"'": None, ",": " "})
 
-    def set_data(self, data):
-        self.data = data
 
-    def set_description(self, description):
-        self.description = description
+def extract_int_from_string(line):
+    numbers = [int(num_str) for num_str in _INT_RE.findall(line)]
+    return numbers
+
 
-    def set_unit(self, unit):
-        self.unit = unit
+def extract_float_from_string(line, dtype=np.float64):
+    numbers = np.fromiter(map(float, _FLOAT_RE.findall(line)), dtype=dtype)
+    return numbers
+
+
+def read_float_block(fid, num_data, dtype=np.float64):
+    # Read lines until num_data numbers are available and parse them in one go. The numbers are counted with the
+    # float regex, which also splits numbers that are not separated by white space (e.g. 0.1E+01-0.2E+01)
+    lines = []
+    num_so_far = 0
+    while num_so_far < num_data:
+        line = fid.readline()
+        if not line:
+            break
+        line = line.replace(",", " ")
+        lines.append(line)
+        num_so_far += len(_FLOAT_RE.findall(line))
+
+    return extract_float_block("".join(lines), num_data, dtype)
+
+
+def extract_float_block(text, num_data, dtype=np.float64):
+    # Parse the first num_data white space (or comma) separated numbers of text in one go
+    try:
+        data = np.fromstring(text.replace(",", " "), dtype=dtype, sep=' ')
+    except ValueError:
+        data = np.zeros(0, dtype=dtype)
+    if data.size < num_data:
+        # numbers not separated by white space, fall back to the general float regex
+        data = extract_float_from_string(text, dtype)
+    return data[0:num_data]
+
+
+# The interpolation kernels below are compiled by numba for scalar (p, T). They are written with numpy functions only,
+# so without numba the same code evaluates whole arrays of points at once
+
+# Bilinear interpolation of the table D[i, j] = f(PP[i], TT[j]) at (p, T). Points outside the table are extrapolated
+# linearly from the nearest cell
+@njit(cache=True, fastmath=True)
+def _bilinear(PP, TT, D, p, T):
+    p = np.float64(p)  # evaluate in double precision, also for float32 tables and arguments
+    T = np.float64(T)
+    i = np.minimum(np.maximum(np.searchsorted(PP, p) - 1, 0), PP.size - 2)
+    j = np.minimum(np.maximum(np.searchsorted(TT, T) - 1, 0), TT.size - 2)
+    wp = (p - PP[i]) / (PP[i + 1] - PP[i])
+    wt = (T - TT[j]) / (TT[j + 1] - TT[j])
+    return ((1.0 - wp) * (1.0 - wt) * D[i, j] + wp * (1.0 - wt) * D[i + 1, j] +
+            (1.0 - wp) * wt * D[i, j + 1] + wp * wt * D[i + 1, j + 1])
+
+
+# Weights of the 4-point Catmull-Rom (cubic Hermite with central difference tangents) stencil x[i0], x[i], x[i + 1],
+# x[i3] at u, where x[i] <= u <= x[i + 1]. At the table edges the stencil is clamped to one sided differences. Outside
+# the table the curve is extended linearly with the tangent at the end point, like the bilinear kernel
+@njit(cache=True, fastmath=True)
+def _catmull_rom_weights(x, u):
+    u = np.float64(u)  # evaluate in double precision, also for float32 tables and arguments
+    i = np.minimum(np.maximum(np.searchsorted(x, u) - 1, 0), x.size - 2)
+    i0 = np.maximum(i - 1, 0)
+    i3 = np.minimum(i + 2, x.size - 1)
+    h = np.float64(x[i + 1]) - x[i]
+    t = (u - x[i]) / h
+    t_in = np.minimum(np.maximum(t, 0.0), 1.0)
+    t2 = t_in * t_in
+    t3 = t2 * t_in
+    a = (t3 - 2.0 * t2 + t_in + np.minimum(t - t_in, 0.0)) * h / (x[i + 1] - x[i0])
+    b = (t3 - t2 + np.maximum(t - t_in, 0.0)) * h / (x[i3] - x[i])
+    return i0, i, i3, -a, 2.0 * t3 - 3.0 * t2 + 1.0 - b, -2.0 * t3 + 3.0 * t2 + a, b
+
+
+# Bicubic (Catmull-Rom in both directions) interpolation of the table D[i, j] = f(PP[i], TT[j]) at (p, T) on the 4x4
+# stencil around the point
+@njit(cache=True, fastmath=True)
+def _bicubic_eval(PP, TT, D, p, T):
+    i0, i, i3, wp0, wp1, wp2, wp3 = _catmull_rom_weights(PP, p)
+    j0, j, j3, wt0, wt1, wt2, wt3 = _catmull_rom_weights(TT, T)
+    return (wp0 * (wt0 * D[i0, j0] + wt1 * D[i0, j] + wt2 * D[i0, j + 1] + wt3 * D[i0, j3]) +
+            wp1 * (wt0 * D[i, j0] + wt1 * D[i, j] + wt2 * D[i, j + 1] + wt3 * D[i, j3]) +
+            wp2 * (wt0 * D[i + 1, j0] + wt1 * D[i + 1, j] + wt2 * D[i + 1, j + 1] + wt3 * D[i + 1, j3]) +
+            wp3 * (wt0 * D[i3, j0] + wt1 * D[i3, j] + wt2 * D[i3, j + 1] + wt3 * D[i3, j3]))
+
+
+# Interpolation kernel of each OlgaPvt method, used for both scalar and array lookups
+_KERNELS = {'linear': _bilinear, 'cubic': _bicubic_eval}
+
+if _HAVE_NUMBA:
+    # Evaluate a compiled kernel at the points (P[k], T[k])
+    @njit(cache=True)
+    def _eval_points(kernel, PP, TT, D, P, T):
+        result = np.empty(P.size)
+        for k in range(P.size):
+            result[k] = kernel(PP, TT, D, P[k], T[k])
+        return result
+else:
+    def _eval_points(kernel, PP, TT, D, P, T):
+        return kernel(PP, TT, D, P, T)
+
+
+def parse_table(block, ntabp, ntabt, dtype=np.float64):
+    # Parse the physical property table given as text in block
+    num_data = ntabt * ntabp  # number of floats to expect
+    tmp = extract_float_block(block, num_data, dtype)
+
+    # store data into 2 - dimensional array data[i, j] = f(PP[i], TT[j]). The temperature index runs fastest in the
+    # file (column by column fortran style in (NTABT, NTABP)), so a row major (NTABP, NTABT) array needs no copy
+    data = np.reshape(tmp, (ntabp, ntabt))
+    return data
+
+
+def read_table(buf, start, end, ntabp, ntabt, dtype=np.float64):
+    # Decode and parse the physical property table in buf[start:end]. Runs in the worker threads of read_pvt
+    return parse_table(buf[start:end].decode(_ENCODING), ntabp, ntabt, dtype)
 
 
 # The following dictionary defines the olga tab fluid properties. The dictionary gives a mapping between the class
@@ -89,10 +209,48 @@ olga_tab_properties = {"ROGTB": {"search": "GAS DENSITY", "description": "Gas de
                        "SOTB": {"search": "LIQUID ENTROPY", "description": "Oil specific entropy"},
                        "SWTB": {"search": "WATER ENTROPY", "description": "Water specific entropy"}}
 
+# The FLUIDF key-word (any number of characters encapsulated in apostrophes) and all physical property key-words
+# fused into a single pattern, applied to one header line of the raw file contents at a time. The name of the
+# matching group identifies the header. The search strings are used as regular expressions (e.g. "GAS . OIL"), so
+# they are not escaped
+_HEADER_RE = re.compile(("(?P<FLUIDF>'.*')|" +
+                         "|".join(f"(?P<{entity}>{prop['search']})" for entity, prop in olga_tab_properties.items())
+                         ).encode())
+
+# Lookup of the bytes that can not be part of a line of numbers. Only lines containing one are candidates for a header
+_NON_NUMERIC = np.ones(256, dtype=bool)
+_NON_NUMERIC[np.frombuffer(b"0123456789 .+-Ee,\t\r\n", dtype=np.uint8)] = False
+
+# The density derivative tables and how they follow from the density tables: (density table, order of derivative
+# with respect to pressure, order of derivative with respect to temperature)
+_DERIVATIVE_TABLES = {"DRGPTB": ("ROGTB", 1, 0), "DROPTB": ("ROOTB", 1, 0), "DRWPTB": ("ROWTB", 1, 0),
+                      "DRGTTB": ("ROGTB", 0, 1), "DROTTB": ("ROOTB", 0, 1), "DRWTTB": ("ROWTB", 0, 1)}
+
+# Pre-compiled search patterns for the olga tab fluid parameters: (param, pattern)
+_PARAM_TABLE = [(param, re.compile(search_str)) for param, search_str in olga_tab_parameters.items()]
+
 
 class OlgaPvt:
-    def __init__(self, pvt_file):
+    # Description of each physical property
+    _descriptions = {entity: prop["description"] for entity, prop in olga_tab_properties.items()}
+
+    def __init__(self, pvt_file, method='cubic', dtype=np.float32, use_spline_derivatives=True, needed=None):
         self.file = pvt_file
+        self.method = method  # interpolation method of the data tables, e.g. 'linear' or 'cubic'
+        self.dtype = dtype  # floating point type of the stored tables, np.float64 for full precision
+        # density derivatives from the density splines instead of the derivative tables (which are then not read)
+        self.use_spline_derivatives = use_spline_derivatives
+        # key-words of the physical property tables to read, e.g. {'ROGTB', 'ROOTB'}. All tables are read if None
+        self.needed = None
+        if needed is not None:
+            self.needed = set(needed)
+            unknown = self.needed.difference(olga_tab_properties)
+            if unknown:
+                raise ValueError(f"Unknown physical properties in needed: {', '.join(sorted(unknown))}")
+            if use_spline_derivatives:
+                # the derivatives are taken from the density tables
+                self.needed.update(_DERIVATIVE_TABLES[entity][0] for entity in list(self.needed)
+                                   if entity in _DERIVATIVE_TABLES)
         self.EOS = 'unspecified'
         self.fluid_name = 'unspecified'
         self.N = 0
@@ -104,85 +262,120 @@ class OlgaPvt:
         self.PBB = []
         self.PDEW = []
         for param in olga_tab_parameters:
-            exec(f"self.{param} = False")
+            setattr(self, param, False)
 
+        # The physical property tables are stored as arrays data[i, j] = f(PP[i], TT[j]), None until read
         for entity in olga_tab_properties:
-            exec(f"self.{entity} = PhysicalProperty()")
+            setattr(self, entity, None)
+        self._units = {}  # unit of each physical property as given in the file
+        self._interps = {}  # interpolant of each physical property, built on first lookup
+        self._splines = {}  # bicubic spline of each physical property for derivatives, built on first lookup
 
     def __str__(self):
         return f"{self.file}"
 
-    def read_pvt(self):
-        fid_pvt = open(self.file, 'r')
-        while True:
-            input_line = fid_pvt.readline()
-            if not input_line:
-                break
+    # Replacing a data table drops the interpolant and spline built from it, replacing the pressure or temperature
+    # grid drops all of them
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in olga_tab_properties:
+            for cache in (self.__dict__.get('_interps', {}), self.__dict__.get('_splines', {})):
+                cache.pop(name, None)
+        elif name in ('PP', 'TT'):
+            for cache in (self.__dict__.get('_interps', {}), self.__dict__.get('_splines', {})):
+                cache.clear()
+
+    # The data table of a physical property. Fails for unknown key-words and for tables not read from the file
+    def olga_table(self, entity):
+        if entity not in olga_tab_properties:
+            raise KeyError(f"Unknown physical property {entity}")
+        data = getattr(self, entity)
+        if data is None:
+            raise ValueError(f"Physical property {entity} has not been read from {self.file}")
+        return data
 
-            s = input_line.strip()
-            # Check for FLUIDF (any number of characters encapsulated in apostrophes)
-            match = re.search("'.*'", s)
-            if match:
-                self.read_fluidf(input_line, fid_pvt)
-                continue  # read new line from top of outer while loop
-
-            found = False
-            for entity in olga_tab_properties:
-                search_str = olga_tab_properties[entity]["search"]
-                match = re.search(search_str, s)
-                if match:
-                    # get rid of search match from string
-                    s = ''.join(re.split(search_str, s))
-                    exec(f"self.{entity}.set_unit('{s.strip()}')")
-                    tmp = self.read_physical_properties(fid_pvt)
-                    exec(f"self.{entity}.set_data(tmp)")
-                    description = olga_tab_properties[entity]["description"]
-                    exec(f"self.{entity}.set_description('{description}')")
-                    found = True
-                    break  # jump out of for loop
-
-            if found:
-                continue  # read new line from top of outer while loop
-
-        fid_pvt.close()
-
-    def read_physical_properties(self, fid_pvt):
-        num_data = self.NTABT * self.NTABP  # number of floats to expect
-        num_so_far = 0
-        tmp = np.zeros(num_data)
-        while num_so_far < num_data:
-            line = fid_pvt.readline()
-            ss = extract_float_from_string(line)
-            n = len(ss)
-            tmp[num_so_far:num_so_far + n] = ss[0:n]
-            num_so_far += n
+    def unit(self, key):
+        return self._units.get(key, 'unspecified')
+
+    def description(self, key):
+        return self._descriptions.get(key, 'unspecified')
+
+    def read_pvt(self, max_workers=None):
+        # The property tables are independent of each other and parsed in parallel by max_workers threads
+        with open(self.file, 'rb') as fid_pvt:
+            if fid_pvt.seek(0, io.SEEK_END) == 0:
+                return  # empty file, nothing to map
+            with mmap.mmap(fid_pvt.fileno(), 0, access=mmap.ACCESS_READ) as buf, \
+                    ThreadPoolExecutor(max_workers=max_workers) as executor:
+                tables = []
+                for entity, header, block_start, block_end in self.find_headers(buf):
+                    if entity == "FLUIDF":
+                        self.read_fluidf(header, io.StringIO(buf[block_start:block_end].decode(_ENCODING)))
+                        continue
+
+                    # skipped tables are never decoded nor parsed
+                    if self.needed is not None and entity not in self.needed:
+                        continue
+                    if self.use_spline_derivatives and entity in _DERIVATIVE_TABLES:
+                        continue
+
+                    future = executor.submit(read_table, buf, block_start, block_end, self.NTABP, self.NTABT,
+                                             self.dtype)
+                    tables.append((entity, header, future))
+
+                for entity, header, future in tables:
+                    setattr(self, entity, future.result())
+                    self._units[entity] = header.strip()
+
+    @staticmethod
+    def find_headers(buf):
+        # Locate all header lines in one pass over the file contents. Returns a list of (entity, header, block_start,
+        # block_end) where header is the header line (the property key-word removed) and buf[block_start:block_end]
+        # the block of data up to the next header line
+        headers = []
+        line_end = 0
+        # skip the lines of numbers with a vectorized byte lookup, only header lines are searched for key-words
+        for candidate in np.flatnonzero(_NON_NUMERIC[np.frombuffer(buf, dtype=np.uint8)]).tolist():
+            if candidate < line_end:
+                continue  # only one header per line
+            line_start = buf.rfind(b"\n", 0, candidate) + 1
+            line_end = buf.find(b"\n", candidate)
+            if line_end < 0:
+                line_end = len(buf)
+            match = _HEADER_RE.search(buf, line_start, line_end)
+            if match is None:
+                continue
+            if match.lastgroup == "FLUIDF":
+                header = buf[line_start:line_end]
+            else:
+                # get rid of search match from string
+                header = buf[line_start:match.start()] + buf[match.end():line_end]
+            headers.append([match.lastgroup, header.decode(_ENCODING), line_start, line_end])
 
-        # store data into 2 - dimensional array - fill column by column fortran style
-        data = np.reshape(tmp, (self.NTABT, self.NTABP), order='F')
-        return data
+        result = []
+        for i, (entity, header, line_start, line_end) in enumerate(headers):
+            block_end = headers[i + 1][2] if i + 1 < len(headers) else len(buf)
+            result.append((entity, header, line_end + 1, block_end))
+        return result
 
     def read_fluidf(self, line, fid_pvt):
-        line = line.replace("'", "")
-        line = line.replace(",", " ")
+        line = line.translate(_CLEAN_TBL)
 
-        for param in olga_tab_parameters:
-            search_str = olga_tab_parameters[param]
-            match = re.search(search_str, line)
+        for param, pattern in _PARAM_TABLE:
+            match = pattern.search(line)
             if match:
-                exec(f"self.{param} = True")
+                setattr(self, param, True)
                 # get rid of search match from string
-                line = ''.join(re.split(search_str, line))
+                line = line[:match.start()] + line[match.end():]
 
-        search_str = '(EOS=)([^}]*)'
-        match = re.search(search_str, line)
+        match = _EOS_RE.search(line)
         if match:
-            tmp = ''.join(re.split('EOS=', match[0]))
-            tmp = tmp.strip()
+            tmp = match[2].strip()
             if len(tmp) == 0:
                 self.EOS = 'UNKNOWN'
             else:
                 self.EOS = tmp
-            line = ''.join(re.split(match[0], line))
+            line = line[:match.start()] + line[match.end():]
         else:
             self.EOS = 'UNKNOWN'
 
@@ -190,96 +383,117 @@ class OlgaPvt:
 
         # first line after shall contains grid size info
         line = fid_pvt.readline()
-        ss = extract_float_from_string(line)
+        try:
+            ss = [float(num_str) for num_str in line.replace(",", " ").split()]
+        except ValueError:
+            # not a plain list of numbers, fall back to the general float regex
+            ss = extract_float_from_string(line)
         self.NTABP = int(ss[0])
         self.NTABT = int(ss[1])
 
         # Total water mass fraction for the feed. Optionally, default value = 0
         # (Only used together with three-phase tables)
-        self.RSWTOTB = ss[2]  # do not know what type of parameter this is
+        self.RSWTOTB = ss[2] if len(ss) > 2 else 0.0  # do not know what type of parameter this is
 
-        self.PP = np.zeros(self.NTABP)
-        self.TT = np.zeros(self.NTABT)
-        self.PBB = np.zeros(self.NTABT)
-        self.PDEW = np.zeros(self.NTABT)
+        self.PP = np.zeros(self.NTABP, dtype=self.dtype)
+        self.TT = np.zeros(self.NTABT, dtype=self.dtype)
+        self.PBB = np.zeros(self.NTABT, dtype=self.dtype)
+        self.PDEW = np.zeros(self.NTABT, dtype=self.dtype)
 
         # the lines following shall contain table data
         self.N = self.NTABP + 3 * self.NTABT  # number of floats to expect
-        num_floats = 0
-        data = np.zeros(self.N)
-        while num_floats < self.N:
-            line = fid_pvt.readline()
-            ss = extract_float_from_string(line)
-            n = len(ss)
-            data[num_floats:num_floats + n] = ss[0:n]
-            num_floats += n
+        data = read_float_block(fid_pvt, self.N, self.dtype)
 
         self.PP = data[0:self.NTABP]
         self.TT = data[self.NTABP:self.NTABP + self.NTABT]
         self.PBB = data[self.NTABP + self.NTABT:self.NTABP + 2 * self.NTABT]
         self.PDEW = data[self.NTABP + 2 * self.NTABT:self.NTABP + 3 * self.NTABT]
 
-    # Main function for 2-interpolation of Olga data tables
-    def lookup_olga_table(self, pressure, temperature, data_table):
-        # f = interpolate.interp2d(self.PP, self.TT, data_table, kind='cubic', bounds_error=False)
-        f = interpolate.RectBivariateSpline(self.PP, self.TT, data_table)
-        return f(pressure, temperature)
-
-    def rho_gas(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.ROGTB.data)
-
-    def rho_oil(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.ROOTB.data)
-
-    def rho_aqu(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.ROWTB.data)
-
-    def drho_oil_dp(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.DROPTB.data)
-
-    def drho_aqu_dp(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.DRWPTB.data)
-
-    def drho_gas_dt(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.DRGTTB.data)
-
-    def drho_oil_dt(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.DROTTB.data)
-
-    def drho_aqu_dt(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.DRWTTB.data)
-
-    def drho_aqu_dt(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.DRWTTB.data)
-
-    def mf_gas_in_gas_and_oil(self, pressure, temperature):
-        return self.lookup_olga_table(pressure, temperature, self.RSGTB.data)
-
-    
-"RSWTB": {"search": "WATER MASS FRACTION OF GAS", "description": "Water vapour mass fraction in "
-"the gas phase"},
-"VSGTB": {"search": "GAS VISCOSITY", "description": "Dynamic viscosity for gas"},
-"VSOTB": {"search": "LIQ. VISCOSITY", "description": "Dynamic viscosity for oil"},
-"VSWTB": {"search": "WAT. VISCOSITY", "description": "Dynamic viscosity for water"},
-"CPGTB": {"search": "GAS SPECIFIC HEAT",
-"description": "Gas heat capacity at constant pressure"},
-"CPOTB": {"search": "LIQ. SPECIFIC HEAT",
-"description": "Oil heat capacity at constant pressure"},
-"CPWTB": {"search": "WAT. SPECIFIC HEAT",
-"description": "Water heat capacity at constant pressure"},
-"HGTB": {"search": "GAS ENTHALPY", "description": "Gas enthalpy"},
-"HOTB": {"search": "LIQ. ENTHALPY", "description": "Oil enthalpy"},
-"HWTB": {"search": "WAT. ENTHALPY", "description": "Water enthalpy"},
-"TKGTB": {"search": "GAS THERMAL COND.", "description": "Gas thermal conductivity"},
-"TKOTB": {"search": "LIQ. THERMAL COND.", "description": "Oil thermal conductivity"},
-"TKWTB": {"search": "WAT. THERMAL COND.", "description": "Water thermal conductivity"},
-"SIGOGT": {"search": "SURFACE TENSION GAS/OIL",
-"description": "Surface tension between gas and oil"},
-"SIGWGT": {"search": "SURFACE TENSION GAS/WATER",
-"description": "Surface tension between gas and "
-"water"},
-"SIGWOT": {"search": "SURFACE TENSION WATER/OIL", "description": "Surface tension between water "
-"and oil"},
-"SGTB": {"search": "GAS ENTROPY", "description": "Gas specific entropy"},
-"SOTB": {"search": "LIQUID ENTROPY", "description": "Oil specific entropy"},
-"SWTB": {"search": "WATER ENTROPY", "description": "Water specific entropy"}}
+    # The interpolant of an Olga data table is built once per property and reused. Values outside the table are
+    # extrapolated
+    def olga_prop_interpolator(self, entity):
+        interp = self._interps.get(entity)
+        if interp is None:
+            interp = interpolate.RegularGridInterpolator((self.PP, self.TT), self.olga_table(entity),
+                                                         method=self.method, bounds_error=False, fill_value=None)
+            self._interps[entity] = interp
+        return interp
+
+    # Main function for 2-interpolation of Olga data tables. Returns a float for scalar pressure and temperature, else
+    # an array. The linear and cubic methods go through the kernels, other methods through the interpolator
+    def lookup_olga_prop(self, pressure, temperature, entity):
+        if np.isscalar(pressure) and np.isscalar(temperature):
+            kernel = _KERNELS.get(self.method)
+            if kernel is not None:
+                return float(kernel(self.PP, self.TT, self.olga_table(entity), pressure, temperature))
+            return float(self.olga_prop_interpolator(entity)([pressure, temperature])[0])
+        return self.lookup_olga_prop_batch(pressure, temperature, entity)
+
+    # Interpolation of Olga data tables at the points (pressure[i], temperature[i]) in one call
+    def lookup_olga_prop_batch(self, pressure, temperature, entity):
+        pressure, temperature = np.broadcast_arrays(np.asarray(pressure, dtype=np.float64),
+                                                    np.asarray(temperature, dtype=np.float64))
+        kernel = _KERNELS.get(self.method)
+        if kernel is not None:
+            values = _eval_points(kernel, self.PP, self.TT, self.olga_table(entity), pressure.ravel(),
+                                  temperature.ravel())
+            return values.reshape(pressure.shape)
+        return self.olga_prop_interpolator(entity)(np.stack([pressure, temperature], axis=-1)).reshape(pressure.shape)
+
+    # The bicubic spline of an Olga data table, used for derivatives. Built once per property and reused
+    def olga_prop_spline(self, entity):
+        spline = self._splines.get(entity)
+        if spline is None:
+            spline = interpolate.RectBivariateSpline(self.PP, self.TT, self.olga_table(entity))
+            self._splines[entity] = spline
+        return spline
+
+    # Density derivatives, either from the derivative of the density spline or the derivative table
+    def lookup_olga_derivative(self, pressure, temperature, entity):
+        if self.use_spline_derivatives:
+            if np.isscalar(pressure) and np.isscalar(temperature):
+                return float(self.lookup_olga_derivative_batch(pressure, temperature, entity))
+            return self.lookup_olga_derivative_batch(pressure, temperature, entity)
+        return self.lookup_olga_prop(pressure, temperature, entity)
+
+    def lookup_olga_derivative_batch(self, pressure, temperature, entity):
+        if self.use_spline_derivatives:
+            density, dx, dy = _DERIVATIVE_TABLES[entity]
+            pressure, temperature = np.broadcast_arrays(np.asarray(pressure, dtype=np.float64),
+                                                        np.asarray(temperature, dtype=np.float64))
+            values = self.olga_prop_spline(density)(pressure.ravel(), temperature.ravel(), dx=dx, dy=dy, grid=False)
+            return np.asarray(values, dtype=np.float64).reshape(pressure.shape)
+        return self.lookup_olga_prop_batch(pressure, temperature, entity)
+
+    # Interpolation of any Olga data table by its key-word, e.g. get('VSGTB', pressure, temperature)
+    def get(self, key, pressure, temperature):
+        if key in _DERIVATIVE_TABLES:
+            return self.lookup_olga_derivative(pressure, temperature, key)
+        return self.lookup_olga_prop(pressure, temperature, key)
+
+    def get_batch(self, key, pressure, temperature):
+        if key in _DERIVATIVE_TABLES:
+            return self.lookup_olga_derivative_batch(pressure, temperature, key)
+        return self.lookup_olga_prop_batch(pressure, temperature, key)
+
+    rho_gas = partialmethod(get, 'ROGTB')
+    rho_oil = partialmethod(get, 'ROOTB')
+    rho_aqu = partialmethod(get, 'ROWTB')
+    drho_gas_dp = partialmethod(get, 'DRGPTB')
+    drho_oil_dp = partialmethod(get, 'DROPTB')
+    drho_aqu_dp = partialmethod(get, 'DRWPTB')
+    drho_gas_dt = partialmethod(get, 'DRGTTB')
+    drho_oil_dt = partialmethod(get, 'DROTTB')
+    drho_aqu_dt = partialmethod(get, 'DRWTTB')
+    mf_gas_in_gas_and_oil = partialmethod(get, 'RSGTB')
+
+    rho_gas_batch = partialmethod(get_batch, 'ROGTB')
+    rho_oil_batch = partialmethod(get_batch, 'ROOTB')
+    rho_aqu_batch = partialmethod(get_batch, 'ROWTB')
+    drho_gas_dp_batch = partialmethod(get_batch, 'DRGPTB')
+    drho_oil_dp_batch = partialmethod(get_batch, 'DROPTB')
+    drho_aqu_dp_batch = partialmethod(get_batch, 'DRWPTB')
+    drho_gas_dt_batch = partialmethod(get_batch, 'DRGTTB')
+    drho_oil_dt_batch = partialmethod(get_batch, 'DROTTB')
+    drho_aqu_dt_batch = partialmethod(get_batch, 'DRWTTB')
+    mf_gas_in_gas_and_oil_batch = partialmethod(get_batch, 'RSGTB')
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+import ParseOlgaPvt
+from ParseOlgaPvt import _bicubic_eval, _bilinear
+
+# The kernels as compiled by numba (when installed) and as plain python
+KERNELS = [_bilinear, _bicubic_eval]
+KERNELS += [kernel.py_func for kernel in KERNELS if hasattr(kernel, "py_func")]
+
+
+def smooth(p, t):
+    return 1.0 + p / 1e7 + 0.01 * t + 1e-5 * t ** 2 + 1e-15 * p ** 2
+
+
+@pytest.mark.parametrize("kernel", KERNELS)
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_kernel_table_dtypes(kernel, dtype):
+    PP = np.linspace(1e5, 2e7, 10).astype(dtype)
+    TT = np.linspace(-10.0, 150.0, 7).astype(dtype)
+    D = smooth(PP[:, None].astype(np.float64), TT[None, :].astype(np.float64)).astype(dtype)
+    # grid points are reproduced for float32 tables with float32 scalars as well
+    value = kernel(PP, TT, D, PP[3], TT[2])
+    assert isinstance(float(value), float)
+    assert value == pytest.approx(float(D[3, 2]), rel=1e-6)
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic", "nearest"])
+def test_scalar_and_batch_lookups_agree(method):
+    pvt = ParseOlgaPvt.OlgaPvt("unused.tab", method=method)
+    pvt.PP = np.linspace(1e5, 2e7, 10).astype(np.float32)
+    pvt.TT = np.linspace(-10.0, 150.0, 7).astype(np.float32)
+    pvt.ROGTB = smooth(pvt.PP[:, None].astype(np.float64), pvt.TT[None, :].astype(np.float64)).astype(np.float32)
+    # inside the table, on a grid point and outside the table
+    pressures = [5e6, float(pvt.PP[3]), 2e7, 5e4]
+    temperatures = [40.0, float(pvt.TT[2]), 200.0, -20.0]
+    scalars = [pvt.rho_gas(p, t) for p, t in zip(pressures, temperatures)]
+    assert all(type(value) is float for value in scalars)
+    np.testing.assert_allclose(scalars, pvt.rho_gas_batch(pressures, temperatures), rtol=1e-12)
+    assert pvt.rho_gas_batch(5e6, 40.0).shape == ()
+
+
+def test_needed_adds_density_of_derivatives_and_rejects_unknown_keys():
+    pvt = ParseOlgaPvt.OlgaPvt("unused.tab", needed={"DRGPTB"})
+    assert pvt.needed == {"DRGPTB", "ROGTB"}
+    # any iterable of key-words, also one that can only be iterated once
+    assert ParseOlgaPvt.OlgaPvt("unused.tab", needed=(key for key in ["DRGPTB"])).needed == {"DRGPTB", "ROGTB"}
+    assert ParseOlgaPvt.OlgaPvt("unused.tab", needed={"DRGPTB"}, use_spline_derivatives=False).needed == {"DRGPTB"}
+    with pytest.raises(ValueError):
+        ParseOlgaPvt.OlgaPvt("unused.tab", needed={"ROGTB", "NOT_A_TABLE"})
+    with pytest.raises(ValueError, match="has not been read"):
+        pvt.rho_oil(5e6, 40.0)
+
+
+@pytest.fixture(params=["numba", "python"])
+def kernels(request, monkeypatch):
+    # run the lookups with the compiled kernels and with the plain python (vectorized) fallback
+    if request.param == "numba":
+        if not ParseOlgaPvt._HAVE_NUMBA:
+            pytest.skip("numba is not installed")
+        return
+    for name in ["_bilinear", "_catmull_rom_weights", "_bicubic_eval"]:
+        kernel = getattr(ParseOlgaPvt, name)
+        monkeypatch.setattr(ParseOlgaPvt, name, getattr(kernel, "py_func", kernel))
+    monkeypatch.setattr(ParseOlgaPvt, "_KERNELS", {"linear": ParseOlgaPvt._bilinear,
+                                                   "cubic": ParseOlgaPvt._bicubic_eval})
+    monkeypatch.setattr(ParseOlgaPvt, "_eval_points", lambda kernel, PP, TT, D, P, T: kernel(PP, TT, D, P, T))
+
+
+def write_tab_file(path, PP, TT):
+    def lines(values):
+        return "".join("".join(f" {value:.8E}" for value in values[k:k + 5]) + "\n"
+                       for k in range(0, len(values), 5))
+
+    text = "'ROUND-TRIP, WATER-OPTION EOS=PR'\n"
+    text += f"   {PP.size}   {TT.size}    .5000000E-01\n"
+    text += lines(np.concatenate([PP, TT, np.full(TT.size, 3e6), np.full(TT.size, 4e6)]))
+    for k, prop in enumerate(ParseOlgaPvt.olga_tab_properties.values()):
+        text += f" {prop['search'].replace(' . ', ' + ')} (UNIT-{k} °)\n"
+        # the temperature index runs fastest in the file
+        text += lines(((k + 1) * smooth(PP[:, None], TT[None, :])).ravel())
+    path.write_bytes(text.encode("latin-1"))
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_read_pvt_round_trip(tmp_path, kernels, method):
+    PP = np.linspace(1e5, 2e7, 9)
+    TT = np.linspace(-10.0, 150.0, 6)
+    write_tab_file(tmp_path / "fluid.tab", PP, TT)
+
+    pvt = ParseOlgaPvt.OlgaPvt(str(tmp_path / "fluid.tab"), method=method, dtype=np.float64,
+                               use_spline_derivatives=False)
+    pvt.read_pvt()
+    assert pvt.fluid_name == "ROUND-TRIP"
+    assert pvt.EOS == "PR"
+    assert pvt.WATER_OPTION
+    assert (pvt.NTABP, pvt.NTABT) == (9, 6)
+    np.testing.assert_allclose(pvt.PP, PP)
+    np.testing.assert_allclose(pvt.TT, TT)
+    for k, entity in enumerate(ParseOlgaPvt.olga_tab_properties):
+        data = getattr(pvt, entity)
+        assert data.shape == (9, 6)
+        np.testing.assert_allclose(data, (k + 1) * smooth(PP[:, None], TT[None, :]), rtol=1e-8)
+        assert pvt.unit(entity) == f"(UNIT-{k} °)"
+
+    pressures = [5e6, PP[3], 1e4, 3e7]
+    temperatures = [40.0, TT[2], -20.0, 200.0]
+    scalars = [pvt.rho_gas(p, t) for p, t in zip(pressures, temperatures)]
+    np.testing.assert_allclose(scalars, pvt.rho_gas_batch(pressures, temperatures), rtol=1e-12)
+    assert scalars[1] == pytest.approx(smooth(PP[3], TT[2]), rel=1e-8)
+    assert scalars[0] == pytest.approx(smooth(5e6, 40.0), rel=1e-2)
+
+
+def test_replacing_a_table_rebuilds_its_interpolant_and_spline():
+    pvt = ParseOlgaPvt.OlgaPvt("unused.tab", method="nearest", dtype=np.float64)
+    pvt.PP = np.linspace(1e5, 2e7, 10)
+    pvt.TT = np.linspace(-10.0, 150.0, 7)
+    pvt.ROGTB = smooth(pvt.PP[:, None], pvt.TT[None, :])
+    rho, drho_dt = pvt.rho_gas(5e6, 40.0), pvt.drho_gas_dt(5e6, 40.0)
+    pvt.ROGTB = 2 * pvt.ROGTB
+    assert pvt.rho_gas(5e6, 40.0) == pytest.approx(2 * rho)
+    assert pvt.drho_gas_dt(5e6, 40.0) == pytest.approx(2 * drho_dt)
+    pvt.TT = pvt.TT + 10.0
+    assert pvt.drho_gas_dt(5e6, 50.0) == pytest.approx(2 * drho_dt)
+
+
+def test_read_pvt_round_trip_spline_derivatives(tmp_path):
+    PP = np.linspace(1e5, 2e7, 9)
+    TT = np.linspace(-10.0, 150.0, 6)
+    write_tab_file(tmp_path / "fluid.tab", PP, TT)
+
+    pvt = ParseOlgaPvt.OlgaPvt(str(tmp_path / "fluid.tab"))
+    pvt.read_pvt()
+    # the derivative tables are not read, the derivatives come from the density spline
+    assert pvt.DRGPTB is None
+    assert pvt.DRGTTB is None
+    assert pvt.ROGTB.dtype == np.float32
+
+    pressures = np.array([5e6, PP[3], 1.5e7])
+    temperatures = np.array([40.0, TT[2], 120.0])
+    drho_dp = 1e-7 + 2e-15 * pressures
+    drho_dt = 0.01 + 2e-5 * temperatures
+    for lookup, lookup_batch, expected in [(pvt.drho_gas_dp, pvt.drho_gas_dp_batch, drho_dp),
+                                           (pvt.drho_gas_dt, pvt.drho_gas_dt_batch, drho_dt)]:
+        scalars = [lookup(p, t) for p, t in zip(pressures, temperatures)]
+        assert all(type(value) is float for value in scalars)
+        np.testing.assert_allclose(scalars, expected, rtol=1e-4)
+        values = lookup_batch(pressures, temperatures)
+        assert values.dtype == np.float64
+        np.testing.assert_allclose(values, scalars, rtol=1e-12)
+        # same broadcasting and return type as the property lookups
+        assert lookup_batch(1e6, 40.0).dtype == np.float64
+        assert lookup_batch(1e6, 40.0).shape == ()
+        assert lookup_batch(pressures[:, None], temperatures).shape == (3, 3)